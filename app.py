@@ -1,14 +1,20 @@
 import os
-import pickle
+import json
 import logging
+import functools
+import random
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 import numpy as np
+import pandas as pd
+from scipy import sparse
 from flask import Flask, render_template, request, jsonify
 from werkzeug.middleware.proxy_fix import ProxyFix
 import re
 import hashlib
 import textwrap
 from pathlib import Path
-import math
 import time
 import os
 
@@ -32,23 +38,160 @@ app.wsgi_app = ProxyFix(app.wsgi_app, x_proto=1, x_host=1)
 # ===========================
 model_data = None
 
+# seconds the home page's (intentionally random) featured picks are reused
+FEATURED_TTL = 60
+
+# (time bucket, picks); replaced with a single assignment so readers never see
+# a bucket paired with another bucket's picks
+FEATURED_CACHE = (None, [])
+
+# Model files written by train.py (convert_model.py migrates an old model.pkl)
+MOVIES_PATH = "movies.parquet"
+SIM_IDX_PATH = "sim_idx.npy"
+SIM_SCORE_PATH = "sim_score.npy"
+INDEX_PATH = "index.json"
+
+# only the columns the app serves; cast/combined_features are training inputs
+MOVIE_COLUMNS = ["id", "title", "overview", "genres", "release_year", "vote_average", "poster_url", "industry", "languages"]
+
+
+def read_model():
+    """Read (movies, sim_idx, sim_score, index) from the model files; nothing is unpickled."""
+    if not all(os.path.exists(p) for p in (MOVIES_PATH, SIM_IDX_PATH, SIM_SCORE_PATH)):
+        raise FileNotFoundError("Model not found. Run train.py first.")
+    movies = pd.read_parquet(MOVIES_PATH, columns=MOVIE_COLUMNS)
+    # memory-mapped: pages are read on demand and shared between forked workers
+    sim_idx = np.load(SIM_IDX_PATH, mmap_mode="r")
+    sim_score = np.load(SIM_SCORE_PATH, mmap_mode="r")
+    if os.path.exists(INDEX_PATH):
+        with open(INDEX_PATH, encoding="utf-8") as f:
+            index = json.load(f)
+    else:
+        index = {normalize_title(t): i for i, t in enumerate(movies["title"])}
+    return movies, sim_idx, sim_score, index
+
+
+def token_bitsets(token_sets, vocab):
+    """Encode per-row token sets as uint64 bitsets of shape (N, words).
+
+    Returns ({token: bit}, bits). Vocabularies over 64 tokens (languages)
+    spill into extra words, so the filter is an AND + any() either way.
+    """
+    bit = {t: i for i, t in enumerate(vocab)}
+    rows, cols = [], []
+    for row, tokens in enumerate(token_sets):
+        for t in tokens:
+            rows.append(row)
+            cols.append(bit[t])
+    rows = np.asarray(rows, dtype=np.intp)
+    cols = np.asarray(cols, dtype=np.intp)
+    bits = np.zeros((len(token_sets), max(1, -(-len(vocab) // 64))), dtype=np.uint64)
+    np.bitwise_or.at(bits, (rows, cols // 64), np.left_shift(np.uint64(1), (cols % 64).astype(np.uint64)))
+    return bit, bits
+
+
+def query_bits(bit, tokens, words):
+    """Bitset for a query's tokens; unknown tokens set no bits (and so match nothing)."""
+    mask = np.zeros(words, dtype=np.uint64)
+    for t in tokens:
+        if t in bit:
+            mask[bit[t] // 64] |= np.uint64(1) << np.uint64(bit[t] % 64)
+    return mask
+
+
+# Optional Numba JIT for the per-request candidate filter; without numba the
+# NumPy mask in get_recommendations is used instead
+try:
+    from numba import njit
+except ImportError:
+    njit = None
+
+# query bitset meaning "no filter" (an empty query, unlike an all-zero one, matches everything)
+NO_FILTER = np.zeros(0, dtype=np.uint64)
+
+
+def _intersects(bits, query):
+    for w in range(query.shape[0]):
+        if bits[w] & query[w]:
+            return True
+    return False
+
+
+def _filter_topk(top_idx, top_scores, gbits, lbits, qg, ql, base_idx, out_ids, out_scores):
+    """Copy the neighbours that pass the seed/score/genre/language checks to out_*; return the count."""
+    cnt = 0
+    for i in range(top_idx.shape[0]):
+        j = top_idx[i]
+        if j == base_idx or top_scores[i] <= 0:
+            continue
+        if qg.shape[0] and not _intersects(gbits[j], qg):
+            continue
+        if ql.shape[0] and not _intersects(lbits[j], ql):
+            continue
+        out_ids[cnt] = j
+        out_scores[cnt] = top_scores[i]
+        cnt += 1
+    return cnt
+
+
+if njit is not None:
+    _intersects = njit(cache=True)(_intersects)
+    filter_topk = njit(cache=True)(_filter_topk)
+else:
+    filter_topk = None
+
 def load_model():
     global model_data
     if model_data is None:
-        if not os.path.exists("model.pkl"):
-            raise FileNotFoundError("Model not found. Run train_model.py first.")
-        with open("model.pkl", "rb") as f:
-            raw = pickle.load(f)
-        
-        # Normalize keys
-        movies = raw.get("movies") or raw.get("df")
-        similarity = raw.get("similarity") or raw.get("cosine_sim") or raw.get("similar")
-        index = raw.get("index") or raw.get("indices") or {t: i for i, t in enumerate(movies["title"])}
-        
+        movies, sim_idx, sim_score, index = read_model()
+
+        # normalized title -> row, first occurrence wins (matches the old linear scan)
+        index_norm = {}
+        for title, idx in index.items():
+            index_norm.setdefault(normalize_title(title), idx)
+
+        # Precompute integer columns once instead of converting per row per request
+        movies["_year_i"] = int_column(movies["release_year"])
+        movies["_id_i"] = int_column(movies["id"])
+
+        # Per-movie token sets; only inputs to the indexes below, so kept out of `movies`
+        lang_sets = [language_tokens(v) for v in movies["languages"]]
+        genre_sets = [frozenset(v.split()) if isinstance(v, str) else frozenset() for v in movies["genres"]]
+
+        # Few distinct industries / language strings: store as category codes
+        # instead of repeated strings
+        movies["industry"] = movies["industry"].astype("category")
+        movies["languages"] = movies["languages"].astype("category")
+
+        # Sparse (movie x language) membership matrix; CSC so one language's
+        # rows are a contiguous slice of `indices`
+        lang_to_col = {lang: i for i, lang in enumerate(sorted(frozenset().union(*lang_sets)))}
+        rows = [pos for pos, langs in enumerate(lang_sets) for _ in langs]
+        cols = [lang_to_col[lang] for langs in lang_sets for lang in langs]
+        lang_matrix = sparse.csc_matrix(
+            (np.ones(len(rows), dtype=bool), (rows, cols)), shape=(len(movies), len(lang_to_col))
+        )
+
+        # token -> bit and per-movie bitsets for the recommendation filters
+        genre_bit, genre_bits = token_bitsets(genre_sets, sorted(frozenset().union(*genre_sets)))
+        lang_bit, lang_bits = token_bitsets(lang_sets, sorted(lang_to_col))
+
         model_data = {
             "movies": movies,
-            "similarity": similarity,
-            "index": index
+            "sim_idx": sim_idx,
+            "sim_score": sim_score,
+            "index": index,
+            "index_norm": index_norm,
+            "lang_to_col": lang_to_col,
+            "lang_matrix": lang_matrix,
+            "genre_bit": genre_bit,
+            "genre_bits": genre_bits,
+            "lang_bit": lang_bit,
+            "lang_bits": lang_bits,
+            # invariant lists for the home page, built once
+            "titles_sorted": sorted(movies["title"].astype(str).tolist()),
+            "genres_sorted": sorted(genre_bit),
+            "languages_sorted": sorted(lang_to_col)
         }
         logger.info(f"Model loaded. Total movies: {len(movies)}")
     return model_data
@@ -57,118 +200,185 @@ def normalize_title(title):
     return title.strip().lower()
 
 
-def safe_int(val):
-    """Safely convert a value to int, returning None if it's missing or NaN."""
-    try:
-        if val is None:
-            return None
-        # handle pandas NaN (float)
-        if isinstance(val, float) and math.isnan(val):
-            return None
-        # try direct int
-        return int(val)
-    except Exception:
-        try:
-            s = str(val).strip()
-            if s == '' or s.lower() == 'nan':
-                return None
-            return int(float(s))
-        except Exception:
-            return None
+def language_tokens(val):
+    """Split a raw `languages` value into a frozenset of clean language names."""
+    if not isinstance(val, str):
+        return frozenset()
+    # Replace commas with spaces to handle joined languages
+    parts = [p.strip() for p in val.replace(',', ' ').split()]
+    # Filter out garbage: must be at least 2 chars, mostly letters, no question marks
+    return frozenset(p for p in parts if len(p) > 1 and p.replace('-', '').isalpha() and '?' not in p)
+
+
+def int_column(series):
+    """Convert a column to nullable Int64 in one vectorized pass (missing/non-numeric -> NA)."""
+    values = pd.to_numeric(series, errors="coerce").astype(float)
+    return np.trunc(values.where(np.isfinite(values))).astype("Int64")
+
+
+def int_or_none(val):
+    """Turn a value from an Int64 column into a JSON-friendly int or None."""
+    return None if pd.isna(val) else int(val)
 
 
 # ===========================
 # Poster handling (frontend-only placeholders)
 # ===========================
 
-# simple in-memory cache for poster URL health checks: url -> bool (True if reachable image)
-POSTER_CHECK_CACHE = {}
+# HEAD-checking every poster costs a round trip per card; TMDb URLs are
+# deterministic and the frontend already falls back to a placeholder on
+# <img> errors, so checks only run when VERIFY_POSTERS=1
+VERIFY_POSTERS = os.environ.get("VERIFY_POSTERS") == "1"
+
+# TMDb image paths (size bucket + hashed file name) essentially always exist,
+# so they are trusted without a HEAD check even when verification is on
+TRUSTED_POSTER_RE = re.compile(r"^https://image\.tmdb\.org/t/p/\w+/[A-Za-z0-9]{20,40}\.(jpg|png)$")
+
+# pooled HTTP client for the HEAD checks (requests is optional, urllib is the fallback)
+try:
+    import requests
+    from requests.adapters import HTTPAdapter
+
+    SESSION = requests.Session()
+    SESSION.mount("https://", HTTPAdapter(pool_connections=32, pool_maxsize=32))
+    SESSION.mount("http://", HTTPAdapter(pool_connections=32, pool_maxsize=32))
+except ImportError:
+    SESSION = None
+
+
+def poster_full_url(poster) -> str:
+    """Return the absolute URL for `poster`, a local '/static/' path as-is, or '' if missing."""
+    if not (poster and isinstance(poster, str) and poster.strip()):
+        return ''
+    poster = poster.strip()
+    if poster.startswith('/static/') or poster.startswith('http://') or poster.startswith('https://'):
+        return poster
+    return f"https://image.tmdb.org/t/p/w342/{poster.lstrip('/')}"
+
+
+# bounded LRU of poster HEAD results: url -> bool (True if reachable image).
+# Guarded by a lock since Flask request threads and the check pool share it.
+POSTER_CACHE_SIZE = 65536
+POSTER_CHECK_CACHE = OrderedDict()
+POSTER_CACHE_LOCK = threading.Lock()
+
+# one shared pool for HEAD fan-out instead of a new executor per page
+POSTER_POOL = ThreadPoolExecutor(max_workers=16)
+
+
+def cached_poster_check(full_url: str):
+    """Cached HEAD result for `full_url`, or None if it hasn't been checked yet."""
+    with POSTER_CACHE_LOCK:
+        ok = POSTER_CHECK_CACHE.get(full_url)
+        if ok is not None:
+            POSTER_CHECK_CACHE.move_to_end(full_url)
+        return ok
+
+
+def check_poster(full_url: str) -> bool:
+    """HEAD-check that `full_url` serves an image, caching the result."""
+    cached = cached_poster_check(full_url)
+    if cached is not None:
+        return cached
+
+    try:
+        if SESSION is not None:
+            resp = SESSION.head(full_url, timeout=3, allow_redirects=True)
+            ok = (resp.status_code == 200 and 'image' in (resp.headers.get('content-type') or '').lower())
+        else:
+            # fallback to urllib; HEAD may not be supported everywhere
+            from urllib.request import Request, urlopen
+            req = Request(full_url, method='HEAD')
+            with urlopen(req, timeout=3) as resp:
+                info = resp.info()
+                ok = ('image' in (info.get_content_type() or ''))
+    except Exception:
+        ok = False
+
+    with POSTER_CACHE_LOCK:
+        POSTER_CHECK_CACHE[full_url] = bool(ok)
+        POSTER_CHECK_CACHE.move_to_end(full_url)
+        if len(POSTER_CHECK_CACHE) > POSTER_CACHE_SIZE:
+            POSTER_CHECK_CACHE.popitem(last=False)
+    return bool(ok)
+
+
+def needs_check(full_url: str) -> bool:
+    """Whether `full_url` has to be HEAD-checked before it is handed to the frontend."""
+    return (VERIFY_POSTERS and bool(full_url) and not full_url.startswith('/static/')
+            and not TRUSTED_POSTER_RE.match(full_url))
 
 
 def resolve_poster_url(poster: str, title_fallback: str = '', industry: str = None, rating: float = None) -> str:
     """Return a usable poster URL or empty string.
 
     Rules:
-    - If `poster` is an absolute HTTP(S) URL, return it if a lightweight HEAD check succeeds (optional).
     - If `poster` is a local static path (starts with '/static/'), return as-is.
-    - If `poster` is a relative path, prefix with TMDB base and return if HEAD check succeeds.
+    - If `poster` is a relative path, prefix with TMDB base.
+    - With VERIFY_POSTERS=1, remote URLs other than well-formed TMDb paths are
+      only returned if a HEAD check succeeds.
     - If poster missing or unreachable, return an empty string so the frontend shows a placeholder.
     """
-    if poster and isinstance(poster, str) and poster.strip():
-        poster = poster.strip()
-        # local static path -> return as-is
-        if poster.startswith('/static/'):
-            return poster
-
-        # build full URL if relative
-        if poster.startswith('http://') or poster.startswith('https://'):
-            full_url = poster
-        else:
-            full_url = f"https://image.tmdb.org/t/p/w342/{poster.lstrip('/')}"
-
-        # lightweight HEAD check (optional): skip if network blocked
-        cached = POSTER_CHECK_CACHE.get(full_url)
-        if cached is not None:
-            return full_url if cached else ''
-
-        try:
-            try:
-                import requests
-                resp = requests.head(full_url, timeout=3, allow_redirects=True)
-                ok = (resp.status_code == 200 and 'image' in (resp.headers.get('content-type') or '').lower())
-            except Exception:
-                # fallback to urllib; HEAD may not be supported everywhere
-                from urllib.request import Request, urlopen
-                req = Request(full_url, method='HEAD')
-                with urlopen(req, timeout=3) as resp:
-                    info = resp.info()
-                    ok = ('image' in (info.get_content_type() or ''))
-        except Exception:
-            ok = False
+    full_url = poster_full_url(poster)
+    if not needs_check(full_url):
+        return full_url
+    return full_url if check_poster(full_url) else ''
 
-        POSTER_CHECK_CACHE[full_url] = bool(ok)
-        return full_url if ok else ''
 
-    # missing poster -> empty string for frontend placeholder
-    return ''
+def resolve_many(posters):
+    """Resolve a batch of posters, running uncached HEAD checks in parallel."""
+    # only cold URLs go to the pool; a fully cached page does no fan-out
+    pending = {u for u in map(poster_full_url, posters) if needs_check(u) and cached_poster_check(u) is None}
+    if pending:
+        list(POSTER_POOL.map(check_poster, pending))
+    return [resolve_poster_url(p) for p in posters]
+
+# ===========================
+# Model handle
+# ===========================
+# Loaded once at import (shared by forked workers with `gunicorn --preload`).
+# Helpers take it as a `data=DATA` default so each call is a local lookup
+# rather than a load_model() call + global check.
+DATA = load_model()
+
+if filter_topk is not None:
+    # Compile (or load from numba's on-disk cache) now, with the same argument
+    # types get_recommendations passes, so no user request pays for the JIT
+    _warm_idx = np.ascontiguousarray(DATA["sim_idx"][0])
+    filter_topk(_warm_idx, np.asarray(DATA["sim_score"][0], dtype=np.float32),
+                DATA["genre_bits"], DATA["lang_bits"], NO_FILTER, NO_FILTER, 0,
+                np.empty(_warm_idx.size, dtype=_warm_idx.dtype), np.empty(_warm_idx.size, dtype=np.float32))
+    del _warm_idx
 
 # ===========================
 # Utility: Random / Featured / Filters
 # ===========================
-def get_random_movies(count=10):
-    data = load_model()
+def movie_records(movies, positions, fields=()):
+    """Build the JSON dicts for the rows at `positions` from one positional slice.
+
+    Every dict has title, overview, genres, languages, poster_url, rating, year
+    and id; extra columns listed in `fields` (e.g. "industry") are copied as-is.
+    """
+    sub = movies.iloc[positions]
+    records = sub[["title", "overview", "genres", "languages", "poster_url", *fields]].to_dict(orient="records")
+    ratings = sub["vote_average"].astype(float).tolist()
+    years = [int_or_none(v) for v in sub["_year_i"]]
+    ids = [int_or_none(v) for v in sub["_id_i"]]
+    posters = resolve_many([r["poster_url"] for r in records])
+
+    for r, poster, rating, year, movie_id in zip(records, posters, ratings, years, ids):
+        r.update(poster_url=poster, rating=rating, year=year, id=movie_id)
+    return records
+
+def get_random_movies(count=10, data=DATA):
     movies = data["movies"]
-    idxs = np.random.choice(len(movies), min(count, len(movies)), replace=False)
-    results = []
-    for i in idxs:
-        m = movies.iloc[i]
-        poster = resolve_poster_url(
-            m.get("poster_url", ""),
-            m.get('title', ''),
-            industry=m.get('industry', None),
-            rating=m.get('vote_average', None)
-        )
-        results.append({
-            "title": m["title"],
-            "overview": m["overview"],
-            "genres": m["genres"],
-            "poster_url": poster,
-            "industry": m.get("industry", "Hollywood"),
-            "languages": m.get("languages", "English"),
-            "rating": float(m.get("vote_average", 0)),
-            "year": safe_int(m.get("release_year", None)),
-            "id": safe_int(m.get("id", None))
-        })
-    return results
+    idxs = random.sample(range(len(movies)), min(count, len(movies)))
+    return movie_records(movies, idxs, fields=("industry",))
 
-def get_all_genres():
-    movies = load_model()["movies"]
-    gset = set()
-    for val in movies["genres"]:
-        gset.update(val.split())
-    return sorted(gset)
+def get_all_genres(data=DATA):
+    return data["genres_sorted"]
 
-def get_featured_picks():
+def get_featured_picks(data=DATA):
     """Return a varied set of featured picks from a RANDOM language.
 
     Strategy:
@@ -178,159 +388,120 @@ def get_featured_picks():
     - Choose 4 random movies from the remaining list.
     - Combine and shuffle.
     """
-    movies = load_model()["movies"]
-    
-    # Extract all unique languages
-    all_langs = set()
-    for val in movies["languages"].dropna():
-        all_langs.update(val.split())
-    all_langs = sorted(list(all_langs))
-    
+    movies = data["movies"]
+    lang_to_col = data["lang_to_col"]
+    lang_matrix = data["lang_matrix"]
+
+    all_langs = data["languages_sorted"]
     if not all_langs:
         return []
 
     # Pick one random language
-    selected_lang = np.random.choice(all_langs)
-    
-    # Filter movies by this language
-    # We check if the selected language is in the 'languages' string column
-    lang_movies = movies[movies["languages"].apply(lambda x: selected_lang in x.split() if isinstance(x, str) else False)]
+    selected_lang = random.choice(all_langs)
     
-    n_total = min(10, len(lang_movies))
+    # Row positions of this language's movies, straight from the sparse column
+    col = lang_to_col[selected_lang]
+    idx = lang_matrix.indices[lang_matrix.indptr[col]:lang_matrix.indptr[col + 1]]
+
+    n_total = min(10, len(idx))
     if n_total == 0:
         return []
 
-    # top pool and random picks from the filtered list
-    top_pool = lang_movies.sort_values("vote_average", ascending=False).head(100 if len(lang_movies) >= 100 else len(lang_movies))
-    try:
-        pick_top = top_pool.sample(min(6, len(top_pool)))
-    except Exception:
-        pick_top = top_pool.head(min(6, len(top_pool)))
+    # top pool (positions of up to 100 best rated, unordered) and random picks from the rest
+    if len(idx) > 100:
+        ratings = np.nan_to_num(movies["vote_average"].to_numpy(dtype=float)[idx], nan=-np.inf)
+        top_pool = idx[np.argpartition(ratings, -100)[-100:]]
+    else:
+        top_pool = idx
+    top_pos = top_pool[random.sample(range(len(top_pool)), min(6, len(top_pool)))]
 
     # ensure we don't sample the same movies
-    remaining = lang_movies.drop(pick_top.index, errors='ignore')
-    try:
-        pick_random = remaining.sample(n_total - len(pick_top))
-    except Exception:
-        pick_random = remaining.head(max(0, n_total - len(pick_top)))
-
-    combined = list(pick_top.iterrows()) + list(pick_random.iterrows())
+    remaining = np.setdiff1d(idx, top_pos, assume_unique=True)
+    rand_pos = remaining[random.sample(range(len(remaining)), n_total - len(top_pos))]
 
     # shuffle order for variety
-    np.random.shuffle(combined)
-
-    featured_list = []
-    for _, m in combined:
-        poster = resolve_poster_url(
-            m.get("poster_url", ""),
-            m.get('title', ''),
-            rating=m.get('vote_average', None)
-        )
-        featured_list.append({
-            "title": m["title"],
-            "overview": m["overview"],
-            "genres": m["genres"],
-            "poster_url": poster,
-            "languages": m.get("languages", "English"),
-            "rating": float(m.get("vote_average", 0)),
-            "year": safe_int(m.get("release_year", None)),
-            "id": safe_int(m.get("id", None))
-        })
+    all_pos = np.concatenate([top_pos, rand_pos])
+    random.shuffle(all_pos)
+
+    featured_list = movie_records(movies, all_pos)
 
     return featured_list
 
 # ===========================
 # Recommendation
 # ===========================
-def get_recommendations(movie_titles, genres=None, languages=None, top_n=10):
-    data = load_model()
+def get_recommendations(movie_titles, genres=None, languages=None, top_n=10, data=DATA):
     movies = data["movies"]
-    sim = data["similarity"]
-    index = data["index"]
+    index_norm = data["index_norm"]
 
     if not movie_titles:
         return []
 
-    seed = normalize_title(movie_titles[0])
-    base_idx = None
-    for title, idx in index.items():
-        if normalize_title(title) == seed:
-            base_idx = idx
-            break
+    base_idx = index_norm.get(normalize_title(movie_titles[0]))
     if base_idx is None:
         return []
 
-    row = sim[base_idx]
-    scores = list(enumerate(row))
-    scores = sorted(scores, key=lambda x: x[1], reverse=True)
-
-    # Take top 50 then pick random top_n
-    slice_for_random = scores[:50] if len(scores) > 50 else scores
-    chosen = np.random.choice(len(slice_for_random), min(top_n, len(slice_for_random)), replace=False)
-    final_sim = [slice_for_random[i] for i in chosen]
-
-    max_score = max([s for _, s in final_sim], default=1.0)
-    recommendations = []
-    for idx, score in final_sim:
-        if idx == base_idx or score <= 0:
-            continue
-        m = movies.iloc[idx]
-
-        # Filters
+    # Neighbours are precomputed at load, so no sort/partition per request
+    top_idx = np.ascontiguousarray(data["sim_idx"][base_idx])
+    row_scores = np.asarray(data["sim_score"][base_idx], dtype=np.float32)
+    genre_bits, lang_bits = data["genre_bits"], data["lang_bits"]
+    qmask_g = query_bits(data["genre_bit"], genres, genre_bits.shape[1]) if genres else NO_FILTER
+    qmask_l = query_bits(data["lang_bit"], languages, lang_bits.shape[1]) if languages else NO_FILTER
+
+    # Drop the seed, padding and filtered-out candidates
+    if filter_topk is not None:
+        out_ids = np.empty(top_idx.size, dtype=top_idx.dtype)
+        out_scores = np.empty(top_idx.size, dtype=np.float32)
+        cnt = filter_topk(top_idx, row_scores, genre_bits, lang_bits, qmask_g, qmask_l, base_idx, out_ids, out_scores)
+        kept, kept_scores = out_ids[:cnt], out_scores[:cnt]
+    else:
+        keep = (top_idx != base_idx) & (row_scores > 0)
         if genres:
-            movie_genres = set((m.get("genres") or "").split())
-            if not any(g in movie_genres for g in genres):
-                continue
+            keep &= (genre_bits[top_idx] & qmask_g).any(axis=1)
         if languages:
-            movie_langs = set((m.get("languages") or "").split())
-            if not any(l in movie_langs for l in languages):
-                continue
-
-        poster = resolve_poster_url(
-            m.get("poster_url", ""),
-            m.get('title', ''),
-            rating=m.get('vote_average', None)
-        )
+            keep &= (lang_bits[top_idx] & qmask_l).any(axis=1)
+        kept, kept_scores = top_idx[keep], row_scores[keep]
+    if kept.size == 0:
+        return []
 
-        recommendations.append({
-            "title": m["title"],
-            "overview": m["overview"],
-            "genres": m["genres"],
-            "languages": m.get("languages", "English"),
-            "similarity": round((float(score) / max_score) * 100, 1),
-            "poster_url": poster,
-            "id": safe_int(m.get("id", None)),
-            "year": safe_int(m.get("release_year", None)),
-            "rating": float(m.get("vote_average", 0))
-        })
+    # Pick random top_n from the surviving top-50 candidates
+    chosen = random.sample(range(kept.size), min(top_n, kept.size))
+    final_ids, final_scores = kept[chosen], kept_scores[chosen].astype(float)
+    max_score = final_scores.max()
+
+    recommendations = movie_records(movies, final_ids)
+    for rec, score in zip(recommendations, final_scores.tolist()):
+        rec["similarity"] = round((score / max_score) * 100, 1)
 
     return recommendations
 
-def get_all_languages():
-    movies = load_model()["movies"]
-    lset = set()
-    for val in movies["languages"].dropna():
-        # Replace commas with spaces to handle joined languages
-        cleaned = val.replace(',', ' ')
-        parts = [p.strip() for p in cleaned.split()]
-        for p in parts:
-            # Filter out garbage: must be at least 2 chars, mostly letters, no question marks
-            if len(p) > 1 and p.replace('-', '').isalpha() and '?' not in p:
-                lset.add(p)
-    return sorted(list(lset))
+def get_all_languages(data=DATA):
+    return data["languages_sorted"]
+
+def get_sorted_titles(data=DATA):
+    return data["titles_sorted"]
+
+def get_cached_featured_picks(data=DATA):
+    """Featured picks shared by all requests within the same FEATURED_TTL-second bucket."""
+    global FEATURED_CACHE
+    bucket = int(time.time() // FEATURED_TTL)
+    cached_bucket, picks = FEATURED_CACHE
+    if cached_bucket != bucket:
+        picks = get_featured_picks(data)
+        FEATURED_CACHE = (bucket, picks)
+    return picks
 
 # ===========================
 # Routes
 # ===========================
 @app.route("/")
 def home():
-    m = load_model()
     return render_template(
         "index.html",
-        movies=sorted(m["movies"]["title"].tolist()),
+        movies=get_sorted_titles(),
         genres=get_all_genres(),
         languages=get_all_languages(),
-        featured=get_featured_picks()
+        featured=get_cached_featured_picks()
     )
 
 @app.route("/recommend", methods=["POST"])
@@ -367,30 +538,16 @@ def summarize_dataset(df):
     - language_counts
     - genre_counts
     """
-    from collections import Counter
-    
     # 1. Languages Analysis
-    # Split comma/space separated languages and clean them
-    all_langs = []
-    for val in df["languages"].dropna():
-        # Reuse the cleaning logic from get_all_languages for consistency
-        cleaned = val.replace(',', ' ')
-        parts = [p.strip() for p in cleaned.split()]
-        for p in parts:
-            if len(p) > 1 and p.replace('-', '').isalpha() and '?' not in p:
-                all_langs.append(p)
-    
-    language_counts = dict(Counter(all_langs))
-    
+    # Split comma/space separated languages and clean them (same rules as language_tokens)
+    langs = df["languages"].dropna().str.replace(',', ' ', regex=False).str.split().explode().dropna().str.strip()
+    valid = (langs.str.len() > 1) & langs.str.replace('-', '', regex=False).str.isalpha() & ~langs.str.contains('?', regex=False)
+    language_counts = langs[valid].value_counts().to_dict()
+
     # 2. Genres Analysis
-    all_genres = []
-    for val in df["genres"].dropna():
-        # Genres are typically space separated in this dataset based on previous code
-        parts = [p.strip() for p in val.split()]
-        all_genres.extend(parts)
-        
-    genre_counts = dict(Counter(all_genres))
-    
+    # Genres are typically space separated in this dataset based on previous code
+    genre_counts = df["genres"].dropna().str.split().explode().dropna().value_counts().to_dict()
+
     # 3. Industry Analysis
     # Check if industry column exists
     if "industry" in df.columns:
@@ -420,13 +577,14 @@ def summarize_dataset(df):
         "genre_counts": genre_counts
     }
 
+@functools.lru_cache(maxsize=1)
+def get_dataset_summary():
+    """Summary of the loaded dataset; the model never changes after load so this is computed once."""
+    return summarize_dataset(DATA["movies"])
+
 @app.route("/summary")
 def summary_route():
-    import pandas as pd
-    data = load_model()
-    movies_df = data["movies"]
-    summary = summarize_dataset(movies_df)
-    return jsonify(summary)
+    return jsonify(get_dataset_summary())
 
 # ===========================
 # Run Server
@@ -0,0 +1,71 @@
+import pickle
+import numpy as np
+from train import TOP_K, save_model
+
+# ============================
+# One-off migration of a legacy model.pkl to the files app.py loads
+# (movies.parquet, sim_idx.npy, sim_score.npy, index.json)
+# ============================
+
+def first_present(raw, *keys):
+    """Return the first value in `raw` stored under one of `keys` (arrays/DataFrames can't be or-ed)."""
+    for key in keys:
+        if raw.get(key) is not None:
+            return raw[key]
+    return None
+
+
+def to_top_k(similarity, n_rows, k=TOP_K):
+    """Normalize a similarity structure to (int32 ids, float16 scores) arrays of shape (N, K).
+
+    Accepts a dense (N, N) score matrix, the dict-of-lists of the original
+    train.py (neighbour ids ordered best-first, no scores), a dict of
+    (ids, scores) pairs, or an already normalized (ids, scores) tuple.
+    Lists without scores get rank-based scores so relative similarity is kept.
+    Short rows are padded with score 0, which get_recommendations skips.
+    """
+    if isinstance(similarity, tuple):
+        ids, scores = similarity
+        return np.asarray(ids, dtype=np.int32), np.asarray(scores, dtype=np.float16)
+
+    if isinstance(similarity, np.ndarray) and similarity.ndim == 2:
+        k = min(k, similarity.shape[1])
+        top_idx = np.zeros((n_rows, k), dtype=np.int32)
+        top_score = np.zeros((n_rows, k), dtype=np.float16)
+        for i, row in enumerate(similarity):
+            best = np.argpartition(row, -k)[-k:]
+            top_idx[i] = best
+            top_score[i] = row[best]
+        return top_idx, top_score
+
+    top_idx = np.zeros((n_rows, k), dtype=np.int32)
+    top_score = np.zeros((n_rows, k), dtype=np.float16)
+    for i, entry in similarity.items():
+        if isinstance(entry, tuple) and len(entry) == 2:
+            ids, scores = entry
+        else:
+            ids = entry
+            scores = (len(entry) - np.arange(len(entry))) / max(len(entry), 1)
+        n = min(len(ids), k)
+        top_idx[i, :n] = np.asarray(ids[:n], dtype=np.int32)
+        top_score[i, :n] = np.asarray(scores[:n], dtype=np.float16)
+    return top_idx, top_score
+
+
+def convert(path="model.pkl"):
+    # Only run this on a model.pkl you trust: unpickling executes arbitrary code
+    with open(path, "rb") as f:
+        raw = pickle.load(f)
+
+    movies = first_present(raw, "movies", "df")
+    similarity = first_present(raw, "similarity", "cosine_sim", "similar")
+    top_idx, top_score = to_top_k(similarity, len(movies))
+    index = raw.get("index") or raw.get("indices")
+    if index is not None:
+        index = {str(t): int(i) for t, i in index.items()}
+    save_model(movies, top_idx, top_score, index)
+
+    print(f"🎉 Converted {path} → movies.parquet, sim_idx.npy, sim_score.npy, index.json")
+
+if __name__ == "__main__":
+    convert()
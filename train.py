@@ -1,5 +1,5 @@
+import json
 import pandas as pd
-import pickle
 from sklearn.feature_extraction.text import TfidfVectorizer
 from sklearn.metrics.pairwise import cosine_similarity
 import numpy as np
@@ -34,6 +34,18 @@ def preprocess(df):
     return df
 
 
+def save_model(df, top_idx, top_score, index=None):
+    """Write the model files the app loads; no pickle, the arrays are memory-mapped."""
+    df = df.reset_index(drop=True)
+    df.to_parquet("movies.parquet", compression="zstd")
+    np.save("sim_idx.npy", np.asarray(top_idx, dtype=np.int32))
+    np.save("sim_score.npy", np.asarray(top_score, dtype=np.float16))
+    if index is None:
+        index = {t.lower(): i for i, t in enumerate(df["title"])}
+    with open("index.json", "w", encoding="utf-8") as f:
+        json.dump(index, f, ensure_ascii=False)
+
+
 def train():
     df = preprocess(load_and_merge())
     print("🔍 Creating TF-IDF matrix...")
@@ -42,26 +54,23 @@ def train():
     mat = vectorizer.fit_transform(df["combined_features"])
 
     print("⚡ Building Top-K Similarity Index...")
-    top_similar = {}
+    top_idx = np.zeros((len(df), TOP_K), dtype=np.int32)
+    top_score = np.zeros((len(df), TOP_K), dtype=np.float16)
 
     for i in range(len(df)):
         sims = cosine_similarity(mat[i], mat).flatten()
         best = sims.argsort()[-TOP_K-1:-1][::-1]  # top K movies
-        top_similar[i] = best.tolist()
+        top_idx[i, :len(best)] = best
+        top_score[i, :len(best)] = sims[best]
 
         if i % 2000 == 0:
             print(f"Processed {i}/{len(df)} movies...")
 
-    with open("model.pkl", "wb") as f:
-        pickle.dump({
-            "df": df,
-            "similar": top_similar,
-            "index": {t.lower(): i for i, t in enumerate(df['title'])}
-        }, f)
+    save_model(df, top_idx, top_score)
 
     print("\n🎉 MODEL READY — No memory issues!")
     print(f"Stored TOP-{TOP_K} recommendations for each movie.")
-    print("File saved → model.pkl")
+    print("Files saved → movies.parquet, sim_idx.npy, sim_score.npy, index.json")
 
 if __name__ == "__main__":
     train()